@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark for Lehjer Document AI API
+
+Reports the slowest imports of main.py (via python -X importtime), the time
+from launching the server to the first healthy /health response, the time
+until /health reports warmed_up, and the server's resident memory at both
+points.
+
+Usage: python benchmark_startup.py [--runs N] [--top N] [--port PORT]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import json
+import time
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_time_report(top: int):
+    # -X importtime writes "import time: self [us] | cumulative | imported package" to stderr
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=HERE, capture_output=True, text=True, env={**os.environ, "PREWARM_IMPORTS": "false"}
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        rows.append((int(cumulative_us), int(self_us), name))
+    if result.returncode != 0:
+        print(result.stderr.splitlines()[-1] if result.stderr else "import main failed")
+        return
+    rows.sort(reverse=True)
+    print(f"Top {top} imports by cumulative time (import main):")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, name in rows[:top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+    for heavy in ["pdfplumber", "pdfminer", "docx", "openpyxl", "openai"]:
+        if any(name.strip() == heavy for _, _, name in rows):
+            print(f"Warning: {heavy} is imported eagerly by main.py")
+
+
+def rss_mb(pid: int):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def format_mb(mb):
+    return f"{mb:.1f}" if mb is not None else "n/a"
+
+
+def get_health(url: str):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            if response.status == 200:
+                return json.loads(response.read())
+    except OSError:
+        pass
+    return None
+
+
+def time_to_healthy(port: int, timeout: float = 60.0):
+    url = f"http://127.0.0.1:{port}/health"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        env={**os.environ, "PREWARM_IMPORTS": "true"}
+    )
+    try:
+        healthy = rss_healthy = None
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError("Server exited before becoming healthy")
+            health = get_health(url)
+            if health is not None and healthy is None:
+                healthy = time.perf_counter() - start
+                rss_healthy = rss_mb(server.pid)
+            # Sample the warmed RSS only once the background pre-warm has finished
+            if health is not None and health.get("warmed_up"):
+                return healthy, time.perf_counter() - start, rss_healthy, rss_mb(server.pid)
+            time.sleep(0.05)
+        state = "warmed up" if healthy is not None else "healthy"
+        raise RuntimeError(f"Server not {state} after {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    import_time_report(args.top)
+    print()
+    print(f"{'run':>4} {'healthy s':>10} {'warmed s':>9} {'RSS healthy MB':>15} {'RSS warmed MB':>14}")
+    timings = []
+    for run in range(1, args.runs + 1):
+        elapsed, warmed, rss_healthy, rss_warmed = time_to_healthy(args.port)
+        timings.append(elapsed)
+        print(f"{run:>4} {elapsed:>10.2f} {warmed:>9.2f} {format_mb(rss_healthy):>15} {format_mb(rss_warmed):>14}")
+    timings.sort()
+    print(f"median time to first healthy response: {timings[len(timings) // 2]:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
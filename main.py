@@ -1,41 +1,276 @@
 import os
+import math
+import time
 import tempfile
 from typing import Any
 from datetime import datetime
 import uuid
 import re
-from fastapi import FastAPI, File, UploadFile, Body
+from fastapi import FastAPI, File, UploadFile, Body, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-import pdfplumber
-import docx
 import csv
-import openpyxl
-from openai import AsyncOpenAI
+import heapq
+import itertools
+import asyncio
+import importlib
+import threading
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-try:
-    from fastapi import FastAPI, File, UploadFile
-    from fastapi.middleware.cors import CORSMiddleware
-    from fastapi.responses import JSONResponse
-    import pdfplumber
-    import docx
-    import csv
-import openpyxl
-    from openai import AsyncOpenAI
-except ImportError as e:
-    raise ImportError(f"Missing dependency: {e}. Please run 'pip install -r requirements.txt'")
+# --- Lazy imports ---
+# The document parsers (pdfplumber/pdfminer, python-docx, openpyxl) and the
+# OpenAI SDK are slow to import, so they are loaded on first use instead of at
+# module load. This keeps cold starts short; see lifespan and prewarm below.
+LAZY_MODULES = ["openai", "pdfplumber", "docx", "openpyxl"]
+
+def load_module(name: str):
+    try:
+        return importlib.import_module(name)
+    except ImportError as e:
+        raise ImportError(f"Missing dependency: {e}. Please run 'pip install -r requirements.txt'")
+
+@asynccontextmanager
+async def lifespan(app):
+    # Load the heavy modules in a background thread once the server is up,
+    # so /health answers immediately and the first upload doesn't pay for the imports.
+    # prewarm() logs its own failures, so the future is not awaited.
+    if os.getenv("PREWARM_IMPORTS", "true").lower() not in ("0", "false", "no"):
+        asyncio.get_running_loop().run_in_executor(None, prewarm)
+    yield
 
 # Create FastAPI app with production settings
 app = FastAPI(
     title="Lehjer Document AI API",
     description="Backend API for document analysis and financial data processing",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# --- Upload admission control ---
+# Limits for /analyze-document/ (sizes in bytes). Requests are rejected with
+# 408 (upload too slow), 413 (too large), 415 (unsupported type) or 429 (rate
+# limited / server busy) while the body is still streaming in.
+MAX_UPLOAD_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", "20")) * 1024 * 1024)
+UPLOAD_SIZE_LIMITS = {
+    "pdf": 20 * 1024 * 1024,
+    "docx": 10 * 1024 * 1024,
+    "xlsx": 10 * 1024 * 1024,
+    "xls": 10 * 1024 * 1024,
+    "csv": 5 * 1024 * 1024,
+    "txt": 2 * 1024 * 1024,
+}
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "50"))
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "10"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "5"))
+MAX_INFLIGHT_UPLOADS = int(os.getenv("MAX_INFLIGHT_UPLOADS", "4"))
+MAX_INFLIGHT_PER_CLIENT = int(os.getenv("MAX_INFLIGHT_PER_CLIENT", "1"))
+UPLOAD_READ_TIMEOUT = float(os.getenv("UPLOAD_READ_TIMEOUT", "60"))
+# Number of proxies in front of the app that append to X-Forwarded-For (Render adds one)
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "1"))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Allowance for multipart boundaries and part headers when checking the request size
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Magic bytes accepted for each supported extension. Legacy OLE .xls workbooks
+# can't be read by openpyxl, so only zip-based .xls files are accepted.
+ALLOWED_SIGNATURES = {
+    "pdf": ["pdf"],
+    "docx": ["zip"],
+    "xlsx": ["zip"],
+    "xls": ["zip"],
+    "csv": ["text"],
+    "txt": ["text"],
+}
+
+class UploadRejected(Exception):
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+def sniff_file_type(chunk: bytes):
+    if chunk.startswith(b"%PDF-"):
+        return "pdf"
+    if chunk.startswith(b"PK\x03\x04"):
+        return "zip"
+    if chunk.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
+        return "ole"
+    if b"\x00" in chunk:
+        return None
+    try:
+        chunk.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # Allow a multi-byte character cut off at the end of the chunk
+        if e.start < len(chunk) - 3:
+            return None
+    return "text"
+
+def check_upload_type(ext: str, chunk: bytes):
+    if ext not in ALLOWED_SIGNATURES:
+        raise UploadRejected(415, "Unsupported file type.")
+    kind = sniff_file_type(chunk)
+    if kind == "ole" and ext == "xls":
+        raise UploadRejected(415, "Legacy .xls files are not supported. Please save the file as .xlsx.")
+    if kind not in ALLOWED_SIGNATURES[ext]:
+        raise UploadRejected(415, f"File content does not match the .{ext} extension.")
+
+def parse_upload_head(head: bytes):
+    """Return (extension, first file bytes) from the start of a multipart body, or None if the part headers are incomplete."""
+    match = re.search(rb'filename="([^"]*)"', head)
+    if not match:
+        return None
+    headers_end = head.find(b"\r\n\r\n", match.end())
+    if headers_end == -1:
+        return None
+    filename = match.group(1).decode("utf-8", "replace")
+    return filename.split('.')[-1].lower(), head[headers_end + 4:]
+
+# Token buckets keyed by client address: {client: [tokens, last_refill]}
+rate_buckets = {}
+inflight_uploads = 0
+# Uploads in progress per client address
+inflight_by_client = {}
+
+def get_client_key(request: Request) -> str:
+    # Render sits behind a proxy, so use the address our trusted proxies saw.
+    # Entries left of those are sent by the client and can't be trusted.
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded and TRUSTED_PROXY_HOPS > 0:
+        hops = [hop.strip() for hop in forwarded.split(",")]
+        if len(hops) >= TRUSTED_PROXY_HOPS and hops[-TRUSTED_PROXY_HOPS]:
+            return hops[-TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else "unknown"
+
+def take_rate_token(client_key: str) -> float:
+    """Consume one token for the client. Returns 0 on success, otherwise seconds until a token is available."""
+    now = time.monotonic()
+    rate = RATE_LIMIT_PER_MINUTE / 60.0
+    tokens, last = rate_buckets.get(client_key, (RATE_LIMIT_BURST, now))
+    tokens = min(RATE_LIMIT_BURST, tokens + (now - last) * rate)
+    if tokens >= 1:
+        rate_buckets[client_key] = [tokens - 1, now]
+        return 0
+    rate_buckets[client_key] = [tokens, now]
+    return (1 - tokens) / rate if rate > 0 else 60.0
+
+def prune_rate_buckets():
+    # Drop buckets that have refilled completely; they are equivalent to new ones
+    if len(rate_buckets) < 1000 or RATE_LIMIT_PER_MINUTE <= 0:
+        return
+    now = time.monotonic()
+    full_after = RATE_LIMIT_BURST * 60.0 / RATE_LIMIT_PER_MINUTE
+    for key, (_, last) in list(rate_buckets.items()):
+        if now - last > full_after:
+            del rate_buckets[key]
+
+def admission_error(status_code: int, message: str, retry_after=None) -> JSONResponse:
+    headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+    return JSONResponse(status_code=status_code, content={"error": message}, headers=headers)
+
+class UploadAdmissionMiddleware:
+    """Admit /analyze-document/ uploads, enforcing type and size limits while the body streams in."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global inflight_uploads
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != "/analyze-document/":
+            await self.app(scope, receive, send)
+            return
+        request = Request(scope)
+        max_body = MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > max_body:
+            await admission_error(413, "File too large.")(scope, receive, send)
+            return
+        # Check the in-flight caps first so a "busy" rejection doesn't cost a rate token
+        client_key = get_client_key(request)
+        if inflight_uploads >= MAX_INFLIGHT_UPLOADS:
+            response = admission_error(429, "Server is busy processing other documents. Please try again shortly.", 5)
+            await response(scope, receive, send)
+            return
+        if inflight_by_client.get(client_key, 0) >= MAX_INFLIGHT_PER_CLIENT:
+            response = admission_error(429, "Please wait for your current upload to finish.", 5)
+            await response(scope, receive, send)
+            return
+        prune_rate_buckets()
+        retry_after = take_rate_token(client_key)
+        if retry_after:
+            response = admission_error(429, "Too many uploads. Please try again later.", math.ceil(retry_after))
+            await response(scope, receive, send)
+            return
+
+        deadline = time.monotonic() + UPLOAD_READ_TIMEOUT
+        received = 0
+        head = b""
+        typed = False
+        body_done = False
+        rejection = None
+
+        async def receive_checked():
+            # Count and inspect the body as the framework reads it, so bad uploads
+            # are stopped without being spooled in full
+            nonlocal received, head, typed, body_done, max_body, rejection
+            if body_done:
+                return await receive()
+            try:
+                message = await asyncio.wait_for(receive(), max(deadline - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                rejection = UploadRejected(408, "Upload took too long.")
+                raise rejection
+            if message["type"] != "http.request":
+                return message
+            body = message.get("body", b"")
+            received += len(body)
+            body_done = not message.get("more_body", False)
+            try:
+                if not typed and len(head) < UPLOAD_CHUNK_SIZE:
+                    head += body[:UPLOAD_CHUNK_SIZE - len(head)]
+                    parsed = parse_upload_head(head)
+                    if parsed and (len(parsed[1]) >= 512 or body_done or len(head) >= UPLOAD_CHUNK_SIZE):
+                        ext, first_bytes = parsed
+                        if ext not in ALLOWED_SIGNATURES:
+                            raise UploadRejected(415, "Unsupported file type.")
+                        # An empty file part is left for the endpoint to report
+                        if not first_bytes.startswith(b"\r\n--"):
+                            check_upload_type(ext, first_bytes)
+                        typed = True
+                        max_body = min(UPLOAD_SIZE_LIMITS[ext], MAX_UPLOAD_BYTES) + MULTIPART_OVERHEAD_BYTES
+                if received > max_body:
+                    raise UploadRejected(413, "File too large.")
+            except UploadRejected as e:
+                rejection = e
+                raise
+            return message
+
+        async def send_unless_rejected(message):
+            # The framework turns errors raised while reading the body into its own
+            # response; drop it and send the admission error instead
+            if rejection is None:
+                await send(message)
+
+        inflight_uploads += 1
+        inflight_by_client[client_key] = inflight_by_client.get(client_key, 0) + 1
+        try:
+            try:
+                await self.app(scope, receive_checked, send_unless_rejected)
+            except UploadRejected:
+                pass
+            if rejection is not None:
+                await admission_error(rejection.status_code, rejection.message)(scope, receive, send)
+        finally:
+            inflight_uploads -= 1
+            inflight_by_client[client_key] -= 1
+            if not inflight_by_client[client_key]:
+                del inflight_by_client[client_key]
+
+app.add_middleware(UploadAdmissionMiddleware)
+
 # Configure CORS for production
 allowed_origins = os.getenv("ALLOWED_ORIGINS", "*").split(",")
 app.add_middleware(
@@ -46,13 +281,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize OpenAI client
+# Initialize OpenAI client (created on first use)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     print("Warning: OPENAI_API_KEY environment variable not set. AI features will be disabled.")
-    client = None
-else:
-    client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+client = None
+
+def get_client():
+    global client
+    if client is None and OPENAI_API_KEY:
+        client = load_module("openai").AsyncOpenAI(api_key=OPENAI_API_KEY)
+    return client
+
+warmed_up = False
+
+def prewarm():
+    global warmed_up
+    for name in LAZY_MODULES:
+        try:
+            load_module(name)
+        except ImportError as e:
+            print(f"Warning: could not pre-warm {name}: {e}")
+    try:
+        get_client()
+    except Exception as e:
+        print(f"Warning: could not create OpenAI client: {e}")
+    warmed_up = True
 
 # Health check endpoint
 @app.get("/")
@@ -61,7 +315,7 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "openai_configured": client is not None}
+    return {"status": "healthy", "openai_configured": bool(OPENAI_API_KEY), "warmed_up": warmed_up}
 
 CATEGORY_LIST = [
     "bank-transactions",
@@ -74,29 +328,124 @@ CATEGORY_LIST = [
     "general-entries"
 ]
 
-# In-memory transaction store
-transactions = []
+# In-memory transaction store, partitioned by tenant (normalized companyName).
+# Each partition keeps its own transactions plus running dashboard and account
+# totals, so queries only touch one tenant's data. Documents without a company
+# name go to the "" (unassigned) tenant. Sync endpoints run in a thread pool,
+# so every access to the store goes through tenants_lock.
+tenants = {}
+tenants_lock = threading.RLock()
+# Global insertion counter, used to list all tenants' transactions in upload order
+transaction_seq = itertools.count()
+MAX_TRANSACTIONS_PER_TENANT = int(os.getenv("MAX_TRANSACTIONS_PER_TENANT", "5000"))
+
+def tenant_key(company_name) -> str:
+    return " ".join(str(company_name or "").split()).lower()
+
+def get_tenant(company_name, create: bool = False):
+    key = tenant_key(company_name)
+    with tenants_lock:
+        if not create:
+            return tenants.get(key)
+        return tenants.setdefault(key, {
+            "companyName": str(company_name or "").strip(),
+            "transactions": [],
+            "sequence": [],
+            "dashboardTotals": {},
+            "accountTotals": {}
+        })
+
+def tenant_has_capacity(company_name) -> bool:
+    with tenants_lock:
+        tenant = get_tenant(company_name)
+        return tenant is None or len(tenant["transactions"]) < MAX_TRANSACTIONS_PER_TENANT
+
+def add_to_account_totals(account_totals: dict, transaction: dict):
+    category = transaction.get("category", "general-entries")
+    amount = safe_amount(transaction.get("amount", 0))
+    t_type = transaction.get("type", "debit")
+    dashboard_category = transaction.get("dashboardCategory", "")
+    account_key = f"{category}_{dashboard_category}" if dashboard_category else category
+    if account_key not in account_totals:
+        account_totals[account_key] = {"debit": 0, "credit": 0, "amount": 0}
+    if t_type == "debit":
+        account_totals[account_key]["debit"] += amount
+    else:
+        account_totals[account_key]["credit"] += amount
+    account_totals[account_key]["amount"] += amount
+
+def add_tenant_transaction(transaction: dict):
+    """Store a copy of the transaction with a numeric amount. Returns None if the tenant's quota is full."""
+    amount = parse_amount(transaction.get("amount", 0))
+    transaction = {**transaction, "amount": amount if amount is not None else 0.0}
+    with tenants_lock:
+        # Checked again here, since uploads check the quota before the OpenAI call
+        if not tenant_has_capacity(transaction.get("companyName", "")):
+            return None
+        tenant = get_tenant(transaction.get("companyName", ""), create=True)
+        tenant["transactions"].append(transaction)
+        tenant["sequence"].append(next(transaction_seq))
+        # Keep the dashboard and statement rollups up to date
+        dashboard_category = transaction.get("dashboardCategory", "")
+        if dashboard_category:
+            amount = transaction["amount"]
+            if dashboard_category == "Cash Balance" and transaction.get("type") != "credit":
+                amount = -amount
+            totals = tenant["dashboardTotals"]
+            totals[dashboard_category] = totals.get(dashboard_category, 0.0) + amount
+        add_to_account_totals(tenant["accountTotals"], transaction)
+    return transaction
+
+def all_transactions():
+    # Merge the per-tenant lists back into global upload order
+    with tenants_lock:
+        partitions = [list(zip(tenant["sequence"], tenant["transactions"])) for tenant in tenants.values()]
+    merged = heapq.merge(*partitions, key=lambda entry: entry[0])
+    return [t for _, t in merged]
 
 async def extract_text(file: UploadFile) -> str:
     ext = file.filename.split('.')[-1].lower()
-    with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{ext}') as tmp:
-        tmp.write(await file.read())
+    if ext not in ALLOWED_SIGNATURES:
+        raise UploadRejected(415, "Unsupported file type.")
+    # Check the magic bytes of the first chunk before writing anything to disk
+    chunk = await file.read(UPLOAD_CHUNK_SIZE)
+    if not chunk:
+        return ""
+    check_upload_type(ext, chunk)
+    size_limit = min(UPLOAD_SIZE_LIMITS[ext], MAX_UPLOAD_BYTES)
+    size = 0
+    # openpyxl only opens workbooks with an .xlsx-style suffix
+    suffix = '.xlsx' if ext == 'xls' else f'.{ext}'
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
         tmp_path = tmp.name
+        try:
+            while chunk:
+                size += len(chunk)
+                if size > size_limit:
+                    raise UploadRejected(413, f"File too large. Maximum size for .{ext} files is {size_limit // (1024 * 1024)} MB.")
+                tmp.write(chunk)
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        except UploadRejected:
+            tmp.close()
+            os.remove(tmp_path)
+            raise
     text = ""
     try:
         if ext == 'pdf':
-            with pdfplumber.open(tmp_path) as pdf:
+            with load_module("pdfplumber").open(tmp_path) as pdf:
+                if len(pdf.pages) > MAX_PDF_PAGES:
+                    raise UploadRejected(413, f"PDF has too many pages. Maximum is {MAX_PDF_PAGES}.")
                 for page in pdf.pages:
                     text += page.extract_text() or ''
         elif ext in ['docx']:
-            doc_file = docx.Document(tmp_path)
+            doc_file = load_module("docx").Document(tmp_path)
             text = '\n'.join([p.text for p in doc_file.paragraphs])
         elif ext == 'csv':
             with open(tmp_path, 'r', encoding='utf-8') as f:
                 csv_reader = csv.reader(f)
                 text = '\n'.join([','.join(row) for row in csv_reader])
         elif ext in ['xls', 'xlsx']:
-            workbook = openpyxl.load_workbook(tmp_path)
+            workbook = load_module("openpyxl").load_workbook(tmp_path)
             text = ""
             for sheet_name in workbook.sheetnames:
                 sheet = workbook[sheet_name]
@@ -113,7 +462,6 @@ async def extract_text(file: UploadFile) -> str:
     return text
 
 # Helper to extract company name from 'company info' section
-import itertools
 
 def extract_company_name(text: str) -> str:
     # Look for a section header like 'Company Info' or 'Company Information'
@@ -163,6 +511,7 @@ async def summarize_and_classify(text: str, company_name: str = "") -> Any:
         f"Document:\n{text[:4000]}"
     )
     try:
+        client = get_client()
         if client is None:
             return {"error": "OpenAI API key not configured"}
         response = await client.chat.completions.create(
@@ -236,10 +585,15 @@ def classify_by_keywords(description):
 @app.post("/analyze-document/")
 async def analyze_document(file: UploadFile = File(...)):
     try:
-        text = await extract_text(file)
+        try:
+            text = await extract_text(file)
+        except UploadRejected as e:
+            return JSONResponse(status_code=e.status_code, content={"error": e.message})
         if not text or text.strip() == "Unsupported file type.":
             return JSONResponse(status_code=400, content={"error": "Unsupported or empty file."})
         company_name = extract_company_name(text)
+        if not tenant_has_capacity(company_name):
+            return JSONResponse(status_code=429, content={"error": "Transaction quota exceeded for this company."})
         result = await summarize_and_classify(text, company_name=company_name)
         if "error" in result:
             return JSONResponse(status_code=500, content={"error": result["error"]})
@@ -247,17 +601,8 @@ async def analyze_document(file: UploadFile = File(...)):
         category = result.get("category", None)
         amount = result.get("amount", 0)
         # Sanitize amount: extract only numeric value, ignore currency
-        if isinstance(amount, str):
-            # Remove all non-numeric, non-dot, non-comma characters
-            match = re.search(r"[\d,.]+", amount.replace(" ", ""))
-            if match:
-                # Remove commas, convert to float
-                amount = float(match.group(0).replace(",", ""))
-            else:
-                amount = 0.0
-        try:
-            amount = float(amount)
-        except (ValueError, TypeError):
+        amount = parse_amount(amount)
+        if amount is None:
             amount = 0.0
         now = datetime.now()
         upload_date = now.strftime("%d/%m/%Y")
@@ -274,7 +619,7 @@ async def analyze_document(file: UploadFile = File(...)):
             dashboard_category = "Net Burn"
         # Default type logic: treat invoices and bank-transactions as credit, bills and others as debit
         t_type = "credit" if category in ["invoices", "bank-transactions"] or (isinstance(amount, (int, float)) and amount >= 0) else "debit"
-        transactions.append({
+        stored = add_tenant_transaction({
             "id": doc_id,
             "date": now.strftime("%Y-%m-%d"),
             "description": summary or file.filename,
@@ -285,6 +630,8 @@ async def analyze_document(file: UploadFile = File(...)):
             "dashboardCategory": dashboard_category or "",
             "companyName": company_name
         })
+        if stored is None:
+            return JSONResponse(status_code=429, content={"error": "Transaction quota exceeded for this company."})
         return {
             "id": doc_id,
             "name": file.filename,
@@ -310,14 +657,36 @@ async def analyze_document(file: UploadFile = File(...)):
             "error": str(e)
         })
 
+@app.get("/tenants/")
+def get_tenants():
+    with tenants_lock:
+        tenant_list = list(tenants.items())
+    return [
+        {
+            "companyName": tenant["companyName"] or None,
+            "unassigned": key == "",
+            "transactionCount": len(tenant["transactions"])
+        }
+        for key, tenant in tenant_list
+    ]
+
 @app.get("/transactions/")
-def get_transactions():
-    return transactions
+def get_transactions(companyName: str = None):
+    if companyName is None:
+        return all_transactions()
+    with tenants_lock:
+        tenant = get_tenant(companyName)
+        return list(tenant["transactions"]) if tenant else []
 
 @app.post("/transactions/")
-def add_transaction(transaction: dict):
-    global transactions
-    transactions.append(transaction)
+def add_transaction(transaction: dict, companyName: str = None):
+    if "amount" in transaction and parse_amount(transaction["amount"]) is None:
+        return JSONResponse(status_code=400, content={"error": "Invalid amount."})
+    if companyName is not None:
+        transaction = {**transaction, "companyName": companyName}
+    transaction = add_tenant_transaction(transaction)
+    if transaction is None:
+        return JSONResponse(status_code=429, content={"error": "Transaction quota exceeded for this company."})
     return {"status": "success", "transaction": transaction}
 
 def safe_amount(val):
@@ -326,26 +695,34 @@ def safe_amount(val):
     except (ValueError, TypeError):
         return 0.0
 
+def parse_amount(val):
+    """Read an amount such as 1234.5, "1,234.50" or "$50". Returns None if no number can be read."""
+    if isinstance(val, str):
+        # Remove currency symbols and thousands separators
+        match = re.search(r"[\d,.]+", val.replace(" ", ""))
+        if not match:
+            return None
+        val = match.group(0).replace(",", "")
+    try:
+        return float(val)
+    except (ValueError, TypeError):
+        return None
+
 @app.get("/dashboard-summary/")
-def get_dashboard_summary():
-    cash_balance = sum(
-        safe_amount(t["amount"]) if t["type"] == "credit" else -safe_amount(t["amount"])
-        for t in transactions if t["dashboardCategory"] == "Cash Balance"
-    )
-    revenue = sum(
-        safe_amount(t["amount"]) for t in transactions if t["dashboardCategory"] == "Revenue"
-    )
-    expenses = sum(
-        safe_amount(t["amount"]) for t in transactions if t["dashboardCategory"] == "Expenses"
-    )
-    net_burn = sum(
-        safe_amount(t["amount"]) for t in transactions if t["dashboardCategory"] == "Net Burn"
-    )
+def get_dashboard_summary(companyName: str = None):
+    with tenants_lock:
+        if companyName is None:
+            selected = [dict(tenant["dashboardTotals"]) for tenant in tenants.values()]
+        else:
+            tenant = get_tenant(companyName)
+            selected = [dict(tenant["dashboardTotals"])] if tenant else []
+    def total(dashboard_category):
+        return sum(totals.get(dashboard_category, 0.0) for totals in selected)
     return {
-        "cashBalance": cash_balance,
-        "revenue": revenue,
-        "expenses": expenses,
-        "netBurn": net_burn
+        "cashBalance": total("Cash Balance"),
+        "revenue": total("Revenue"),
+        "expenses": total("Expenses"),
+        "netBurn": total("Net Burn")
     }
 
 @app.post("/classify-transaction/")
@@ -388,6 +765,7 @@ async def classify_transaction(data: dict = Body(...)):
         f"Description:\n{description}"
     )
     try:
+        client = get_client()
         if client is None:
             return {"error": "OpenAI API key not configured"}
         response = await client.chat.completions.create(
@@ -431,7 +809,22 @@ async def classify_transaction(data: dict = Body(...)):
 @app.post("/generate-financial-statements/")
 async def generate_financial_statements(data: dict = Body(...)):
     try:
-        transactions = data.get("transactions", [])
+        # Use the stored ledger of one company when no transactions are posted
+        if "transactions" not in data and "companyName" in data:
+            with tenants_lock:
+                tenant = get_tenant(data["companyName"])
+                transactions = list(tenant["transactions"]) if tenant else []
+                account_totals = {key: dict(totals) for key, totals in tenant["accountTotals"].items()} if tenant else {}
+        else:
+            # Read each posted amount once, so every statement below uses the same number
+            transactions = []
+            for transaction in data.get("transactions", []):
+                amount = parse_amount(transaction.get("amount", 0))
+                transactions.append({**transaction, "amount": amount if amount is not None else 0.0})
+            # Group transactions by category and type
+            account_totals = {}
+            for transaction in transactions:
+                add_to_account_totals(account_totals, transaction)
 
         # Process transactions to generate financial statements
         balance_sheet = []
@@ -439,28 +832,6 @@ async def generate_financial_statements(data: dict = Body(...)):
         trial_balance = []
         cash_flow = []
 
-        # Group transactions by category and type
-        account_totals = {}
-
-        for transaction in transactions:
-            category = transaction.get("category", "general-entries")
-            amount = transaction.get("amount", 0)
-            t_type = transaction.get("type", "debit")
-            dashboard_category = transaction.get("dashboardCategory", "")
-
-            # Create account key
-            account_key = f"{category}_{dashboard_category}" if dashboard_category else category
-
-            if account_key not in account_totals:
-                account_totals[account_key] = {"debit": 0, "credit": 0, "amount": 0}
-
-            if t_type == "debit":
-                account_totals[account_key]["debit"] += amount
-                account_totals[account_key]["amount"] += amount
-            else:
-                account_totals[account_key]["credit"] += amount
-                account_totals[account_key]["amount"] += amount
-
         # --- Grouping logic for balance sheet ---
         # Map account_key/category to main group and sub-account name for balance sheet
         balance_sheet_group_map = {
@@ -682,7 +1053,10 @@ async def generate_financial_statements(data: dict = Body(...)):
         return JSONResponse(status_code=500, content={"error": str(e)})
 
 @app.post("/reset-data/")
-def reset_data():
-    global transactions
-    transactions.clear()
+def reset_data(companyName: str = None):
+    with tenants_lock:
+        if companyName is not None:
+            tenants.pop(tenant_key(companyName), None)
+            return {"status": "success", "message": f"Data for {companyName} has been reset."}
+        tenants.clear()
     return {"status": "success", "message": "All data has been reset."} 
\ No newline at end of file